@@ -1,8 +1,8 @@
 """ETL: validate, clean, and build analytical marts.
 
-Reads:
-- demand_raw.csv
-- staffing_raw.csv
+Reads (Parquet or CSV; exactly one format per extract):
+- demand_raw.parquet / demand_raw.csv
+- staffing_raw.parquet / staffing_raw.csv
 
 Writes (parquet):
 - curated/fact_contacts.parquet
@@ -22,75 +22,143 @@ from __future__ import annotations
 
 import argparse
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 
+from wfm_io import align_categories, epoch_ns, write_parquet
+from wfm_math import erlang_c_batch
 
-AGG_INTERVAL_MINUTES = [30, 60, 480, 720, 1440]  # 30m, 1h, 8h, 12h, 24h
 
+AGG_INTERVAL_MINUTES = [30, 60, 480, 720, 1440]  # 30m, 1h, 8h, 12h, 24h
 
-def _read_csv(path: str) -> pd.DataFrame:
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"Missing input file: {path}")
-    return pd.read_csv(path)
 
+# Raw extract schemas. Timestamps are UTC in the extracts (naive or with an offset)
+# and are localized after the read; integer columns get a default when empty.
+DEMAND_COLUMN_TYPES = {
+    "timestamp_start": pa.timestamp("us"),
+    "interval_minutes": pa.int64(),
+    "channel": pa.string(),
+    "queue": pa.string(),
+    "offered_contacts": pa.int64(),
+    "handled_contacts": pa.int64(),
+    "abandoned_contacts": pa.int64(),
+    "aht_seconds": pa.float64(),
+    "asa_seconds": pa.float64(),
+    "service_level": pa.float64(),
+    "sla_threshold_seconds": pa.int64(),
+}
+DEMAND_NULL_DEFAULTS = {
+    "interval_minutes": 15,
+    "offered_contacts": 0,
+    "handled_contacts": 0,
+    "abandoned_contacts": 0,
+}
+
+STAFFING_COLUMN_TYPES = {
+    "timestamp_start": pa.timestamp("us"),
+    "interval_minutes": pa.int64(),
+    "channel": pa.string(),
+    "queue": pa.string(),
+    "agents_scheduled": pa.int64(),
+    "shrinkage_rate": pa.float64(),
+    "agents_available": pa.int64(),
+    "cost_per_hour": pa.float64(),
+}
+STAFFING_NULL_DEFAULTS = {
+    "interval_minutes": 15,
+    "agents_scheduled": 0,
+    "agents_available": 0,
+}
+
+
+def _utc_timestamps(col: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Timestamps (typed, or parsed from strings) as timestamp[us, UTC]; naive values are UTC."""
+    if pa.types.is_timestamp(col.type):
+        return col.cast(pa.timestamp("us", tz="UTC"))
+    try:
+        # Fast path: naive ISO strings, as the generator writes them.
+        return col.cast(pa.timestamp("us")).cast(pa.timestamp("us", tz="UTC"))
+    except pa.ArrowInvalid:
+        # Zone offsets ("+00:00", "Z") or mixed forms.
+        parsed = pd.to_datetime(col.to_pandas(), utc=True, format="mixed")
+        return pa.chunked_array([parsed.astype("datetime64[us, UTC]")])
+
+
+def _read_raw(
+    in_dir: str, name: str, column_types: dict[str, pa.DataType], null_defaults: dict[str, int]
+) -> pd.DataFrame:
+    """Read a raw extract (Parquet or CSV) in one typed PyArrow pass and check it has every schema column."""
+    parquet_path = os.path.join(in_dir, f"{name}.parquet")
+    csv_path = os.path.join(in_dir, f"{name}.csv")
+    if os.path.exists(parquet_path) and os.path.exists(csv_path):
+        raise ValueError(f"Ambiguous input: both {parquet_path} and {csv_path} exist; remove one")
+    if os.path.exists(parquet_path):
+        path = parquet_path
+        table = pq.read_table(path)
+    elif os.path.exists(csv_path):
+        path = csv_path
+        # Defaulted counts may come back as "2.0" (pandas writes int columns with gaps as
+        # float), so they are read as float64 and cast after the fill; timestamps are read
+        # as strings and parsed below.
+        csv_types = {col: pa.float64() if col in null_defaults else typ for col, typ in column_types.items()}
+        csv_types["timestamp_start"] = pa.string()
+        table = pacsv.read_csv(
+            path,
+            read_options=pacsv.ReadOptions(use_threads=True),
+            convert_options=pacsv.ConvertOptions(column_types=csv_types),
+        )
+    else:
+        raise FileNotFoundError(f"Missing input file: {parquet_path} or {csv_path}")
 
-def _validate_and_cast(demand: pd.DataFrame, staffing: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
-    # Demand
-    required_demand_cols = {
-        "timestamp_start",
-        "interval_minutes",
-        "channel",
-        "queue",
-        "offered_contacts",
-        "handled_contacts",
-        "abandoned_contacts",
-        "aht_seconds",
-        "asa_seconds",
-        "service_level",
-        "sla_threshold_seconds",
-    }
-    missing = required_demand_cols - set(demand.columns)
+    missing = set(column_types) - set(table.column_names)
     if missing:
-        raise ValueError(f"demand_raw.csv missing columns: {sorted(missing)}")
-
-    required_staff_cols = {
-        "timestamp_start",
-        "interval_minutes",
-        "channel",
-        "queue",
-        "agents_scheduled",
-        "shrinkage_rate",
-        "agents_available",
-        "cost_per_hour",
-    }
-    missing = required_staff_cols - set(staffing.columns)
-    if missing:
-        raise ValueError(f"staffing_raw.csv missing columns: {sorted(missing)}")
+        raise ValueError(f"{os.path.basename(path)} missing columns: {sorted(missing)}")
+
+    for col, default in null_defaults.items():
+        # Truncating cast, like the former astype(int).
+        filled = pc.fill_null(table[col], default).cast(column_types[col], safe=False)
+        table = table.set_column(table.column_names.index(col), col, filled)
 
-    demand = demand.copy()
-    staffing = staffing.copy()
+    # Parquet carries its own (e.g. dictionary/int32) types; bring them onto the CSV schema.
+    for col, typ in column_types.items():
+        if col != "timestamp_start" and table[col].type != typ:
+            table = table.set_column(table.column_names.index(col), col, table[col].cast(typ))
 
-    demand["timestamp_start"] = pd.to_datetime(demand["timestamp_start"], utc=True)
-    staffing["timestamp_start"] = pd.to_datetime(staffing["timestamp_start"], utc=True)
+    ts_idx = table.column_names.index("timestamp_start")
+    table = table.set_column(ts_idx, "timestamp_start", _utc_timestamps(table["timestamp_start"]))
 
-    # Basic numeric coercion
-    for col in ["offered_contacts", "handled_contacts", "abandoned_contacts"]:
-        demand[col] = pd.to_numeric(demand[col], errors="coerce").fillna(0).astype(int)
+    return table.to_pandas()
 
-    for col in ["aht_seconds", "asa_seconds", "service_level", "sla_threshold_seconds"]:
-        demand[col] = pd.to_numeric(demand[col], errors="coerce")
 
-    for col in ["agents_scheduled", "agents_available"]:
-        staffing[col] = pd.to_numeric(staffing[col], errors="coerce").fillna(0).astype(int)
+def _write_csv(df: pd.DataFrame, path: str) -> None:
+    """Write df with Arrow's multithreaded CSV writer.
 
-    for col in ["shrinkage_rate", "cost_per_hour"]:
-        staffing[col] = pd.to_numeric(staffing[col], errors="coerce")
+    Timestamps are written as naive UTC seconds (Postgres TIMESTAMP) and
+    categoricals as plain strings.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    columns = []
+    for field, col in zip(table.schema, table.columns):
+        if pa.types.is_timestamp(field.type):
+            col = col.cast(pa.timestamp("s"), safe=False)
+        elif pa.types.is_dictionary(field.type):
+            col = col.cast(field.type.value_type)
+        columns.append(col)
+    table = pa.Table.from_arrays(columns, names=table.column_names)
+    pacsv.write_csv(table, path, write_options=pacsv.WriteOptions(include_header=True))
 
-    demand["interval_minutes"] = pd.to_numeric(demand["interval_minutes"], errors="coerce").fillna(15).astype(int)
-    staffing["interval_minutes"] = pd.to_numeric(staffing["interval_minutes"], errors="coerce").fillna(15).astype(int)
+
+def _validate_and_cast(demand: pd.DataFrame, staffing: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    # Types and required columns are enforced by _read_raw; inputs are not reused
+    # by the caller, so keys are normalized in place.
 
     # Normalize casing
     demand["channel"] = demand["channel"].astype(str).str.lower().str.strip()
@@ -98,6 +166,10 @@ def _validate_and_cast(demand: pd.DataFrame, staffing: pd.DataFrame) -> tuple[pd
     demand["queue"] = demand["queue"].astype(str).str.lower().str.strip()
     staffing["queue"] = staffing["queue"].astype(str).str.lower().str.strip()
 
+    # Low-cardinality keys as categoricals sharing one category set, so groupby/merge
+    # run on integer codes and demand/staffing stay join-compatible.
+    align_categories(demand, staffing, ["channel", "queue"])
+
     # Join keys
     demand = demand.sort_values(["timestamp_start", "channel", "queue"]).reset_index(drop=True)
     staffing = staffing.sort_values(["timestamp_start", "channel", "queue"]).reset_index(drop=True)
@@ -118,96 +190,146 @@ def _build_dims(demand: pd.DataFrame, out_dir: str) -> None:
     tmin = demand["timestamp_start"].min()
     tmax = demand["timestamp_start"].max()
     rng = pd.date_range(tmin, tmax, freq="15min", tz="UTC")
+    # Calendar fields with integer math on epoch ns (no per-element datetime objects).
+    ns = epoch_ns(rng)
+    day = ns // 86_400_000_000_000
+    dow = ((day + 3) % 7).astype(np.int8)  # 0=Mon; 1970-01-01 was a Thursday
     dim_time = pd.DataFrame({"timestamp_start": rng})
-    dim_time["date"] = dim_time["timestamp_start"].dt.date
-    dim_time["dow"] = dim_time["timestamp_start"].dt.dayofweek  # 0=Mon
-    dim_time["hour"] = dim_time["timestamp_start"].dt.hour
-    dim_time["minute"] = dim_time["timestamp_start"].dt.minute
-    dim_time["week_start"] = (dim_time["timestamp_start"].dt.to_period("W").dt.start_time).dt.date
+    dim_time["date"] = _date32(day)
+    dim_time["dow"] = dow
+    dim_time["hour"] = ((ns // 3_600_000_000_000) % 24).astype(np.int8)
+    dim_time["minute"] = ((ns // 60_000_000_000) % 60).astype(np.int8)
+    dim_time["week_start"] = _date32(day - dow)
+
+    write_parquet(dim_channel, os.path.join(out_dir, "dim_channel.parquet"))
+    write_parquet(dim_queue, os.path.join(out_dir, "dim_queue.parquet"))
+    write_parquet(dim_time, os.path.join(out_dir, "dim_time.parquet"))
+
+
+def _date32(epoch_days: np.ndarray) -> pd.arrays.ArrowExtensionArray:
+    """Days since the epoch as an Arrow date32 column (parquet DATE)."""
+    return pd.arrays.ArrowExtensionArray(pa.array(epoch_days.astype("datetime64[D]")))
 
-    dim_channel.to_parquet(os.path.join(out_dir, "dim_channel.parquet"), index=False)
-    dim_queue.to_parquet(os.path.join(out_dir, "dim_queue.parquet"), index=False)
-    dim_time.to_parquet(os.path.join(out_dir, "dim_time.parquet"), index=False)
+
+def _bucket_series(ns: np.ndarray, minutes: int, index: pd.Index) -> pd.Series:
+    """Floor epoch-ns timestamps to `minutes` boundaries with integer math."""
+    step = minutes * 60 * 10**9
+    bucket = pd.to_datetime((ns // step) * step, unit="ns", utc=True)
+    return pd.Series(bucket, index=index, name="bucket")
 
 
 def _aggregate_interval(
     demand: pd.DataFrame,
     staffing: pd.DataFrame,
     minutes: int,
+    ns_demand: np.ndarray | None = None,
+    ns_staff: np.ndarray | None = None,
 ) -> tuple[pd.DataFrame, pd.DataFrame]:
-    """Aggregate 15-min facts to a larger interval."""
+    """Aggregate 15-min facts to a larger interval.
+
+    ns_demand / ns_staff are optional precomputed epoch_ns arrays, so callers
+    aggregating to several intervals convert timestamps only once.
+    """
     if minutes % 15 != 0:
         raise ValueError("Aggregation interval must be a multiple of 15 minutes")
 
-    d = demand.copy()
-    s = staffing.copy()
+    if ns_demand is None:
+        ns_demand = epoch_ns(demand["timestamp_start"])
+    if ns_staff is None:
+        ns_staff = epoch_ns(staffing["timestamp_start"])
 
-    # Floor timestamps to interval boundaries
-    d["bucket"] = d["timestamp_start"].dt.floor(f"{minutes}min")
-    s["bucket"] = s["timestamp_start"].dt.floor(f"{minutes}min")
+    # Floor timestamps to interval boundaries (group keys only; inputs are not copied)
+    d_bucket = _bucket_series(ns_demand, minutes, demand.index)
+    s_bucket = _bucket_series(ns_staff, minutes, staffing.index)
 
     # Demand aggregation
+    # Weighted AHT by handled contacts: sum(aht * w) / sum(w), both plain groupby sums
+    # of derived Series, so no column is added to (and no copy made of) demand.
+    keys = [d_bucket, demand["channel"], demand["queue"]]
+    w = demand["handled_contacts"].clip(lower=1).astype("float64")
+    aht_num = (demand["aht_seconds"].astype("float64") * w).groupby(keys, observed=True).sum()
+    aht_den = w.groupby(keys, observed=True).sum()
     d_agg = (
-        d.groupby(["bucket", "channel", "queue"], as_index=False)
+        demand.groupby(keys, observed=True)
         .agg(
             offered_contacts=("offered_contacts", "sum"),
             handled_contacts=("handled_contacts", "sum"),
             abandoned_contacts=("abandoned_contacts", "sum"),
-            # Weighted AHT by handled contacts
-            aht_seconds=("aht_seconds", lambda x: float(np.average(x, weights=d.loc[x.index, "handled_contacts"].clip(lower=1)))),
             # Keep SLA threshold as max (should be constant within channel)
             sla_threshold_seconds=("sla_threshold_seconds", "max"),
         )
-        .rename(columns={"bucket": "timestamp_start"})
     )
+    d_agg.insert(d_agg.columns.get_loc("sla_threshold_seconds"), "aht_seconds", aht_num / aht_den)
 
     # Staffing aggregation
     # For scheduled/available agents, take average over the interval.
     s_agg = (
-        s.groupby(["bucket", "channel", "queue"], as_index=False)
+        staffing.groupby([s_bucket, "channel", "queue"], observed=True)
         .agg(
             agents_scheduled=("agents_scheduled", "mean"),
             agents_available=("agents_available", "mean"),
             shrinkage_rate=("shrinkage_rate", "mean"),
             cost_per_hour=("cost_per_hour", "mean"),
         )
-        .rename(columns={"bucket": "timestamp_start"})
     )
 
     # Recompute ASA + service level at aggregated interval (real-time channels only)
     # We approximate using Erlang C with aggregated load.
     interval_seconds = minutes * 60
-    merged = d_agg.merge(s_agg, on=["timestamp_start", "channel", "queue"], how="left")
+    # Both aggregates carry the same sorted (bucket, channel, queue) index, so this is an aligned join.
+    merged = d_agg.join(s_agg[["agents_available"]], how="left")
     merged["agents_available"] = merged["agents_available"].fillna(0).round().astype(int)
 
-    asa_list = []
-    sl_list = []
-    for row in merged.itertuples(index=False):
-        handled = max(0, int(row.handled_contacts))
-        aht = float(row.aht_seconds) if pd.notnull(row.aht_seconds) else 0.0
-        agents = max(0, int(row.agents_available))
-        threshold = float(row.sla_threshold_seconds) if pd.notnull(row.sla_threshold_seconds) else 0.0
-
-        if row.channel in ("voice", "chat") and handled > 0 and agents > 0 and aht > 0:
-            res = erlang_c_summary(handled, interval_seconds, aht, agents, threshold)
-            asa_list.append(res.asa_seconds)
-            sl_list.append(res.service_level)
-        elif row.channel == "email" and handled > 0 and agents > 0 and aht > 0:
-            capacity = agents * (interval_seconds / aht)
-            sl_list.append(min(1.0, capacity / max(1.0, handled)))
-            asa_list.append(float("nan"))
-        else:
-            asa_list.append(float("nan"))
-            sl_list.append(float("nan"))
-
-    d_agg["asa_seconds"] = asa_list
-    d_agg["service_level"] = sl_list
+    handled = np.maximum(0, merged["handled_contacts"].to_numpy(dtype=np.int64))
+    aht = merged["aht_seconds"].fillna(0.0).to_numpy(dtype=np.float64)
+    agents = np.maximum(0, merged["agents_available"].to_numpy(dtype=np.int64))
+    threshold = merged["sla_threshold_seconds"].fillna(0.0).to_numpy(dtype=np.float64)
+
+    # 0 = real-time (voice/chat), 1 = throughput (email), 2 = other
+    channel = merged.index.get_level_values("channel")
+    channel_code = np.select(
+        [channel.isin(["voice", "chat"]), channel == "email"],
+        [0, 1],
+        default=2,
+    ).astype(np.int8)
+    active = (handled > 0) & (agents > 0) & (aht > 0)
+
+    asa = np.full(len(merged), np.nan)
+    sl = np.full(len(merged), np.nan)
+
+    rt = active & (channel_code == 0)
+    asa[rt], sl[rt] = erlang_c_batch(handled[rt], interval_seconds, aht[rt], agents[rt], threshold[rt])
+
+    em = active & (channel_code == 1)
+    capacity = agents[em] * (interval_seconds / aht[em])
+    sl[em] = np.minimum(1.0, capacity / np.maximum(1.0, handled[em]))
+
+    d_agg["asa_seconds"] = asa
+    d_agg["service_level"] = sl
     d_agg["interval_minutes"] = minutes
     s_agg["interval_minutes"] = minutes
 
+    d_agg = d_agg.reset_index().rename(columns={"bucket": "timestamp_start"})
+    s_agg = s_agg.reset_index().rename(columns={"bucket": "timestamp_start"})
+
     return d_agg, s_agg
 
 
+def _aggregate_and_write(
+    demand: pd.DataFrame,
+    staffing: pd.DataFrame,
+    minutes: int,
+    agg_root: str,
+    ns_demand: np.ndarray | None = None,
+    ns_staff: np.ndarray | None = None,
+) -> None:
+    d_agg, s_agg = _aggregate_interval(demand, staffing, minutes, ns_demand=ns_demand, ns_staff=ns_staff)
+    d_path = os.path.join(agg_root, f"{minutes}m")
+    os.makedirs(d_path, exist_ok=True)
+    write_parquet(d_agg, os.path.join(d_path, "fact_contacts.parquet"))
+    write_parquet(s_agg, os.path.join(d_path, "fact_staffing.parquet"))
+
+
 def _write_postgres_load_csvs(demand: pd.DataFrame, staffing: pd.DataFrame, out_dir: str) -> None:
     os.makedirs(out_dir, exist_ok=True)
 
@@ -247,9 +369,7 @@ def _write_postgres_load_csvs(demand: pd.DataFrame, staffing: pd.DataFrame, out_
 
     # --- Fact CSVs (column names and order match \copy in 02_load_from_csv.sql) ---
 
-    demand_out = demand.copy()
-    demand_out["timestamp_start"] = demand_out["timestamp_start"].dt.strftime("%Y-%m-%d %H:%M:%S")
-    demand_out = demand_out.rename(columns={
+    demand_out = demand.rename(columns={
         "timestamp_start": "ts_start",
         "channel": "channel_name",
         "queue": "queue_name",
@@ -259,11 +379,9 @@ def _write_postgres_load_csvs(demand: pd.DataFrame, staffing: pd.DataFrame, out_
         "offered_contacts", "handled_contacts", "abandoned_contacts",
         "aht_seconds", "asa_seconds", "service_level", "sla_threshold_seconds",
     ]
-    demand_out[fact_contacts_cols].to_csv(os.path.join(out_dir, "fact_contacts.csv"), index=False)
+    _write_csv(demand_out[fact_contacts_cols], os.path.join(out_dir, "fact_contacts.csv"))
 
-    staffing_out = staffing.copy()
-    staffing_out["timestamp_start"] = staffing_out["timestamp_start"].dt.strftime("%Y-%m-%d %H:%M:%S")
-    staffing_out = staffing_out.rename(columns={
+    staffing_out = staffing.rename(columns={
         "timestamp_start": "ts_start",
         "channel": "channel_name",
         "queue": "queue_name",
@@ -272,12 +390,12 @@ def _write_postgres_load_csvs(demand: pd.DataFrame, staffing: pd.DataFrame, out_
         "ts_start", "interval_minutes", "channel_name", "queue_name",
         "agents_scheduled", "agents_available", "shrinkage_rate", "cost_per_hour",
     ]
-    staffing_out[fact_staffing_cols].to_csv(os.path.join(out_dir, "fact_staffing.csv"), index=False)
+    _write_csv(staffing_out[fact_staffing_cols], os.path.join(out_dir, "fact_staffing.csv"))
 
 
 def main() -> None:
     parser = argparse.ArgumentParser()
-    parser.add_argument("--in_dir", required=True, help="Directory containing demand_raw.csv and staffing_raw.csv")
+    parser.add_argument("--in_dir", required=True, help="Directory containing demand_raw and staffing_raw (.parquet or .csv)")
     parser.add_argument("--out_dir", required=True, help="Output directory (curated)")
     args = parser.parse_args()
 
@@ -286,35 +404,38 @@ def main() -> None:
 
     os.makedirs(out_dir, exist_ok=True)
 
-    demand = _read_csv(os.path.join(in_dir, "demand_raw.csv"))
-    staffing = _read_csv(os.path.join(in_dir, "staffing_raw.csv"))
+    demand = _read_raw(in_dir, "demand_raw", DEMAND_COLUMN_TYPES, DEMAND_NULL_DEFAULTS)
+    staffing = _read_raw(in_dir, "staffing_raw", STAFFING_COLUMN_TYPES, STAFFING_NULL_DEFAULTS)
 
     demand, staffing = _validate_and_cast(demand, staffing)
 
-    # Base 15m facts
-    demand.to_parquet(os.path.join(out_dir, "fact_contacts.parquet"), index=False)
-    staffing.to_parquet(os.path.join(out_dir, "fact_staffing.parquet"), index=False)
-
-    # Dims
-    _build_dims(demand, out_dir)
-
-    # Aggregations
     agg_root = os.path.join(out_dir, "aggregations")
-    for minutes in AGG_INTERVAL_MINUTES:
-        d_agg, s_agg = _aggregate_interval(demand, staffing, minutes)
-        d_path = os.path.join(agg_root, f"{minutes}m")
-        os.makedirs(d_path, exist_ok=True)
-        d_agg.to_parquet(os.path.join(d_path, "fact_contacts.parquet"), index=False)
-        s_agg.to_parquet(os.path.join(d_path, "fact_staffing.parquet"), index=False)
-
-    # Postgres load CSVs (15m base)
-    _write_postgres_load_csvs(demand, staffing, os.path.join(out_dir, "postgres_load"))
+    ns_demand = epoch_ns(demand["timestamp_start"])
+    ns_staff = epoch_ns(staffing["timestamp_start"])
+
+    # Outputs are independent and only read demand/staffing; Arrow encoding and
+    # compression release the GIL, so the writes overlap on a thread pool.
+    tasks = [
+        # Base 15m facts
+        partial(write_parquet, demand, os.path.join(out_dir, "fact_contacts.parquet")),
+        partial(write_parquet, staffing, os.path.join(out_dir, "fact_staffing.parquet")),
+        # Dims
+        partial(_build_dims, demand, out_dir),
+        # Aggregations
+        *(
+            partial(_aggregate_and_write, demand, staffing, minutes, agg_root, ns_demand, ns_staff)
+            for minutes in AGG_INTERVAL_MINUTES
+        ),
+        # Postgres load CSVs (15m base)
+        partial(_write_postgres_load_csvs, demand, staffing, os.path.join(out_dir, "postgres_load")),
+    ]
+    with ThreadPoolExecutor(max_workers=len(tasks)) as ex:
+        futures = [ex.submit(task) for task in tasks]
+        for fut in futures:
+            fut.result()
 
     print(f"Wrote curated marts to: {out_dir}")
 
 
 if __name__ == "__main__":
-    # Avoid expensive import-time work; main is fast.
-    from wfm_math import erlang_c_summary
-
     main()
@@ -22,16 +22,20 @@ from __future__ import annotations
 
 import argparse
 import os
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
+from itertools import repeat
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
 
+from wfm_io import align_categories, epoch_ns, write_parquet, write_table
 from wfm_math import (
-    erlang_c_summary,
-    required_agents_realtime,
-    required_agents_throughput,
+    erlang_c_batch,
+    required_agents_batch,
+    scheduled_agents_batch,
 )
 
 
@@ -67,31 +71,36 @@ def _load_inputs(in_dir: str, interval_minutes: int) -> tuple[pd.DataFrame, pd.D
     for df in (contacts, staffing):
         df["timestamp_start"] = pd.to_datetime(df["timestamp_start"], utc=False)
 
+    align_categories(contacts, staffing, ["channel", "queue"])
+
     return contacts, staffing
 
 
-def _time_bucket(ts: pd.Series, interval_minutes: int) -> pd.Series:
+def _time_bucket(ts_values_ns: np.ndarray, interval_minutes: int) -> np.ndarray:
     # Bucket within a day: 0..(day_minutes/interval_minutes - 1)
-    minutes_from_midnight = ts.dt.hour * 60 + ts.dt.minute
-    return (minutes_from_midnight // interval_minutes).astype(int)
+    return ((ts_values_ns % 86_400_000_000_000) // (interval_minutes * 60_000_000_000)).astype(np.int32)
 
 
 def _fit_profile_and_trend(series_df: pd.DataFrame, interval_minutes: int) -> dict:
     """Fit seasonal profile and daily trend for one channel/queue series."""
-    df = series_df.copy()
-    df["dow"] = df["timestamp_start"].dt.dayofweek
-    df["bucket"] = _time_bucket(df["timestamp_start"], interval_minutes)
+    dow = series_df["timestamp_start"].dt.dayofweek.rename("dow")
+    bucket = pd.Series(
+        _time_bucket(epoch_ns(series_df["timestamp_start"]), interval_minutes), index=series_df.index, name="bucket"
+    )
 
     # Use robust median profile to reduce sensitivity to synthetic spikes.
-    profile = (
-        df.groupby(["dow", "bucket"])["offered_contacts"]
-        .median()
-        .rename("profile")
-        .reset_index()
+    profile = series_df.groupby([dow, bucket])["offered_contacts"].median()
+
+    # Dense (dow, bucket) lookup; buckets never observed stay at 0.
+    prof_arr = np.zeros((7, (24 * 60) // interval_minutes), dtype=np.float64)
+    prof_arr[profile.index.get_level_values("dow"), profile.index.get_level_values("bucket")] = profile.to_numpy(
+        dtype=np.float64
     )
+    # Profile sum per dow, used to normalize daily totals in _forecast_series.
+    prof_totals = np.maximum(1e-6, prof_arr.sum(axis=1))
 
     # Daily totals for trend.
-    daily = df.resample("D", on="timestamp_start")["offered_contacts"].sum().reset_index()
+    daily = series_df.resample("D", on="timestamp_start")["offered_contacts"].sum().reset_index()
     daily["t"] = np.arange(len(daily), dtype=float)
 
     # Simple linear trend fit (clipped to avoid negative).
@@ -111,7 +120,8 @@ def _fit_profile_and_trend(series_df: pd.DataFrame, interval_minutes: int) -> di
     base_level = max(1e-6, float(daily["offered_contacts"].tail(28).mean())) if len(daily) else 1.0
 
     return {
-        "profile": profile,
+        "prof_arr": prof_arr,
+        "prof_totals": prof_totals,
         "trend_slope": slope,
         "trend_intercept": intercept,
         "base_level": base_level,
@@ -119,31 +129,22 @@ def _fit_profile_and_trend(series_df: pd.DataFrame, interval_minutes: int) -> di
 
 
 def _forecast_series(model: dict, future_index: pd.DatetimeIndex, interval_minutes: int) -> pd.Series:
-    # Build the seasonal profile lookup.
-    prof = model["profile"].copy()
-    prof["key"] = prof["dow"].astype(str) + "_" + prof["bucket"].astype(str)
-    prof_map = dict(zip(prof["key"], prof["profile"].astype(float)))
-
-    future_df = pd.DataFrame({"timestamp_start": future_index})
-    future_df["dow"] = future_df["timestamp_start"].dt.dayofweek
-    future_df["bucket"] = _time_bucket(future_df["timestamp_start"], interval_minutes)
-    future_df["key"] = future_df["dow"].astype(str) + "_" + future_df["bucket"].astype(str)
+    dow = future_index.dayofweek.to_numpy()
+    bucket = _time_bucket(epoch_ns(future_index), interval_minutes)
 
     # Trend scales daily totals; convert to per-interval scaling.
-    future_df["day"] = future_df["timestamp_start"].dt.floor("D")
-    day_ord = (future_df["day"].rank(method="dense").astype(int) - 1).astype(float)
+    day = future_index.floor("D")
+    day_ord = ((day - day.min()) // pd.Timedelta(days=1)).to_numpy(dtype=np.float64)
     daily_total = model["trend_intercept"] + model["trend_slope"] * day_ord
     daily_total = np.maximum(0.0, daily_total)
 
-    # Profile sum per day for normalization.
-    # Compute expected total from profile for each dow.
-    prof_totals = model["profile"].groupby("dow")["profile"].sum().to_dict()
-    expected_total = future_df["dow"].map(lambda d: max(1e-6, float(prof_totals.get(int(d), 1.0))))
+    # Normalize by the profile's expected total for each dow.
+    expected_total = model["prof_totals"][dow]
 
-    base = future_df["key"].map(lambda k: float(prof_map.get(k, 0.0)))
+    base = model["prof_arr"][dow, bucket]
     forecast = base * (daily_total / expected_total)
 
-    return forecast.astype(float)
+    return pd.Series(forecast, dtype=float)
 
 
 def _evaluate_forecast(actual: pd.Series, pred: pd.Series) -> dict:
@@ -156,15 +157,74 @@ def _evaluate_forecast(actual: pd.Series, pred: pd.Series) -> dict:
     return {"mape": mape, "rmse": rmse}
 
 
-def _simulate_scenario(
-    forecast_df: pd.DataFrame,
-    staffing_ref: pd.DataFrame,
+def _process_series(
+    channel: str,
+    queue: str,
+    df_series: pd.DataFrame,
     interval_minutes: int,
-    scenario: Scenario,
-) -> pd.DataFrame:
-    df = forecast_df.copy()
+    horizon_days: int,
+    holdout_days: int,
+) -> tuple[pd.DataFrame, dict | None]:
+    """Fit, evaluate, and forecast one channel/queue series.
+
+    Returns the future forecast frame and a model quality row (None without a holdout).
+    """
+    df_series = df_series.sort_values("timestamp_start")
+
+    # Holdout split
+    cutoff = df_series["timestamp_start"].max() - pd.Timedelta(days=holdout_days)
+    train = df_series[df_series["timestamp_start"] <= cutoff]
+    test = df_series[df_series["timestamp_start"] > cutoff]
+
+    model = _fit_profile_and_trend(train, interval_minutes)
+
+    # Evaluate on holdout
+    quality_row = None
+    if len(test) > 0:
+        pred_test = _forecast_series(model, pd.DatetimeIndex(test["timestamp_start"]), interval_minutes)
+        q = _evaluate_forecast(test["offered_contacts"], pred_test)
+        quality_row = {
+            "channel": channel,
+            "queue": queue,
+            "mape": q["mape"],
+            "rmse": q["rmse"],
+            "holdout_days": holdout_days,
+        }
+
+    # Forecast future
+    last_ts = df_series["timestamp_start"].max()
+    freq = f"{interval_minutes}min"
+    future_index = pd.date_range(
+        start=last_ts + pd.Timedelta(minutes=interval_minutes),
+        periods=int(horizon_days * 24 * 60 / interval_minutes),
+        freq=freq,
+    )
+    pred_future = _forecast_series(model, future_index, interval_minutes)
+
+    f = pd.DataFrame(
+        {
+            "timestamp_start": future_index,
+            "channel": channel,
+            "queue": queue,
+            "forecast_offered": pred_future.values,
+            "interval_minutes": interval_minutes,
+        }
+    )
+    return f, quality_row
 
-    # Merge staffing reference to get costs, shrinkage, and SLA thresholds.
+
+def _unique_rows(*keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Group rows by equal key tuples.
+
+    Returns the first row of each group and the row -> group inverse, so a kernel
+    can run on rows[first] and be scattered back with result[inverse].
+    """
+    _, first, inverse = np.unique(np.column_stack(keys), axis=0, return_index=True, return_inverse=True)
+    return first, inverse.reshape(-1)
+
+
+def _attach_staffing_ref(forecast_df: pd.DataFrame, staffing_ref: pd.DataFrame) -> pd.DataFrame:
+    """Join per-series costs, shrinkage, SLA thresholds, and AHT onto the forecast rows."""
     staff_cols = [
         "channel",
         "queue",
@@ -174,109 +234,129 @@ def _simulate_scenario(
         "aht_seconds",
         "is_realtime",
     ]
-    ref = staffing_ref[staff_cols].drop_duplicates(subset=["channel", "queue"])
-    df = df.merge(ref, on=["channel", "queue"], how="left")
-
-    df["scenario_id"] = scenario.scenario_id
-    df["scenario_name"] = scenario.name
+    ref = staffing_ref[staff_cols].drop_duplicates(subset=["channel", "queue"]).set_index(["channel", "queue"])
+    # Index lookup against the small per-series reference; join returns a new frame.
+    return forecast_df.join(ref, on=["channel", "queue"], how="left")
 
-    df["forecast_offered"] = df["forecast_offered"] * scenario.demand_multiplier
 
-    shrink = np.clip(df["shrinkage_rate"].fillna(0.30) + scenario.shrinkage_delta, 0.0, 0.70)
-    df["scenario_shrinkage"] = shrink
-
-    df["scenario_cost_per_hour"] = df["cost_per_hour"].fillna(22.0) * scenario.wage_multiplier
+def _simulate_scenario(
+    df: pd.DataFrame,
+    interval_minutes: int,
+    scenario: Scenario,
+) -> dict[str, np.ndarray]:
+    """Size staffing for one scenario.
+
+    df is the forecast with the staffing reference already attached
+    (_attach_staffing_ref), shared by every scenario. Returns only the
+    scenario-specific columns (including the scaled forecast_offered); shared
+    columns are attached once by _assemble_scenarios.
+    """
+    forecast_offered = df["forecast_offered"].to_numpy(dtype=np.float64) * scenario.demand_multiplier
+    shrink = np.clip(df["shrinkage_rate"].fillna(0.30).to_numpy(dtype=np.float64) + scenario.shrinkage_delta, 0.0, 0.70)
+    cost_per_hour = df["cost_per_hour"].fillna(22.0).to_numpy(dtype=np.float64) * scenario.wage_multiplier
 
     interval_seconds = interval_minutes * 60
     interval_hours = interval_minutes / 60.0
 
-    # Required agents
-    req_agents = []
-    achieved_sla = []
-    achieved_asa = []
-
-    for row in df.itertuples(index=False):
-        offered = max(0.0, float(row.forecast_offered))
-        aht = max(1.0, float(row.aht_seconds))
-        thr = max(1.0, float(row.sla_threshold_seconds))
-        is_rt = bool(row.is_realtime)
-        shrinkage = max(0.0, float(row.scenario_shrinkage))
-
-        if is_rt:
-            req = required_agents_realtime(
-                contacts=offered,
-                aht_seconds=aht,
-                interval_seconds=interval_seconds,
-                sla_threshold_seconds=thr,
-                sla_target=0.80,
-                shrinkage_rate=shrinkage,
-            )
-            er = erlang_c_summary(
-                contacts=offered,
-                interval_seconds=interval_seconds,
-                aht_seconds=aht,
-                agents=req.available_agents,
-                sla_threshold_seconds=thr,
-            )
-            req_agents.append(req.scheduled_agents)
-            achieved_sla.append(er.service_level)
-            achieved_asa.append(er.asa_seconds)
-        else:
-            req = required_agents_throughput(
-                contacts=offered,
-                aht_seconds=aht,
-                interval_seconds=interval_seconds,
-                shrinkage_rate=shrinkage,
-            )
-            # Throughput SLA proxy: capacity / demand
-            capacity_contacts = (req.available_agents * interval_seconds) / aht
-            sla = 1.0 if offered <= 0 else float(min(1.0, capacity_contacts / offered))
-            req_agents.append(req.scheduled_agents)
-            achieved_sla.append(sla)
-            achieved_asa.append(float("nan"))
-
-    df["required_agents_scheduled"] = req_agents
-
-    # Planned schedule = required + scenario buffer
-    planned = np.ceil(df["required_agents_scheduled"] * (1.0 + scenario.staffing_buffer)).astype(int)
-    df["planned_agents_scheduled"] = planned
-    df["planned_agents_available"] = np.floor(planned * (1.0 - df["scenario_shrinkage"])).astype(int)
-
-    # Service/cost with planned schedule
-    costs = df["planned_agents_scheduled"] * df["scenario_cost_per_hour"] * interval_hours
-    df["planned_labor_cost"] = costs
-
-    # Recompute achieved SLA using planned availability (for real-time)
-    new_sla = []
-    new_asa = []
-    for row, avail in zip(df.itertuples(index=False), df["planned_agents_available"].values):
-        offered = max(0.0, float(row.forecast_offered))
-        aht = max(1.0, float(row.aht_seconds))
-        thr = max(1.0, float(row.sla_threshold_seconds))
-        is_rt = bool(row.is_realtime)
-
-        if is_rt:
-            er = erlang_c_summary(
-                contacts=offered,
-                interval_seconds=interval_seconds,
-                aht_seconds=aht,
-                agents=int(avail),
-                sla_threshold_seconds=thr,
-            )
-            new_sla.append(er.service_level)
-            new_asa.append(er.asa_seconds)
+    # Required agents (real-time rows via Erlang C, throughput rows via capacity)
+    offered = np.fmax(0.0, forecast_offered)
+    aht = np.fmax(1.0, df["aht_seconds"].to_numpy(dtype=np.float64))
+    thr = np.fmax(1.0, df["sla_threshold_seconds"].to_numpy(dtype=np.float64))
+    shrinkage = np.fmax(0.0, shrink)
+    is_rt = df["is_realtime"].to_numpy(dtype=bool)
+    rt_idx = np.flatnonzero(is_rt)
+    tp_idx = np.flatnonzero(~is_rt)
+
+    # Real-time Erlang-C inputs repeat heavily (quiet hours, flat profiles), so each
+    # distinct (offered, aht, threshold[, agents]) combination is evaluated once.
+    rt_offered, rt_aht, rt_thr = offered[rt_idx], aht[rt_idx], thr[rt_idx]
+
+    req_available = np.empty(len(df), dtype=np.int64)
+    first, inverse = _unique_rows(rt_offered, rt_aht, rt_thr)
+    req_available[rt_idx] = required_agents_batch(
+        contacts=rt_offered[first],
+        interval_seconds=interval_seconds,
+        aht_seconds=rt_aht[first],
+        sla_threshold_seconds=rt_thr[first],
+        sla_target=0.80,
+    )[inverse]
+    req_available[tp_idx] = np.ceil(offered[tp_idx] * aht[tp_idx] / interval_seconds)
+
+    required = scheduled_agents_batch(req_available, shrinkage)
+
+    # Planned schedule = required + scenario buffer, as integer ceil(req * num / den).
+    den = 10_000
+    num = int(round((1.0 + scenario.staffing_buffer) * den))
+    planned = (required * num + den - 1) // den
+    avail = np.floor(planned * (1.0 - shrinkage)).astype(np.int64)
+
+    # Achieved SLA using planned availability (Erlang C for real-time)
+    achieved_sla = np.empty(len(df), dtype=np.float64)
+    achieved_asa = np.full(len(df), np.nan)
+    rt_avail = avail[rt_idx]
+    first, inverse = _unique_rows(rt_offered, rt_aht, rt_thr, rt_avail)
+    asa_u, sl_u = erlang_c_batch(
+        contacts=rt_offered[first],
+        interval_seconds=interval_seconds,
+        aht_seconds=rt_aht[first],
+        agents=rt_avail[first],
+        sla_threshold_seconds=rt_thr[first],
+    )
+    achieved_asa[rt_idx] = asa_u[inverse]
+    achieved_sla[rt_idx] = sl_u[inverse]
+    # Throughput SLA proxy: capacity / demand
+    capacity_contacts = (avail[tp_idx] * interval_seconds) / aht[tp_idx]
+    achieved_sla[tp_idx] = np.where(
+        offered[tp_idx] <= 0,
+        1.0,
+        np.minimum(1.0, capacity_contacts / np.maximum(offered[tp_idx], 1e-9)),
+    )
+
+    return {
+        "forecast_offered": forecast_offered,
+        "scenario_shrinkage": shrink,
+        "scenario_cost_per_hour": cost_per_hour,
+        "required_agents_scheduled": required,
+        "planned_agents_scheduled": planned,
+        "planned_agents_available": avail,
+        # Service/cost with planned schedule
+        "planned_labor_cost": planned * cost_per_hour * interval_hours,
+        "achieved_service_level": achieved_sla,
+        "achieved_asa_seconds": achieved_asa,
+        "under_over_staffed": planned - required,
+    }
+
+
+def _assemble_scenarios(
+    shared: pd.DataFrame,
+    scenarios: list[Scenario],
+    results: list[dict[str, np.ndarray]],
+) -> pa.Table:
+    """Stack per-scenario columns under the shared forecast/reference columns.
+
+    Shared columns are converted to Arrow once and repeated by reference (one
+    chunk per scenario) rather than copied per scenario. Scenario columns map NaN
+    to null, as Table.from_pandas does (e.g. ASA on throughput rows).
+    """
+    base = pa.Table.from_pandas(shared, preserve_index=False)
+    n = base.num_rows
+
+    columns = {}
+    for name in base.column_names:
+        if name in results[0]:
+            columns[name] = pa.array(np.concatenate([r[name] for r in results]), from_pandas=True)
         else:
-            capacity_contacts = (int(avail) * interval_seconds) / aht
-            sla = 1.0 if offered <= 0 else float(min(1.0, capacity_contacts / offered))
-            new_sla.append(sla)
-            new_asa.append(float("nan"))
+            columns[name] = pa.chunked_array(base[name].chunks * len(results), type=base.schema.field(name).type)
 
-    df["achieved_service_level"] = new_sla
-    df["achieved_asa_seconds"] = new_asa
+    codes = pa.array(np.repeat(np.arange(len(scenarios), dtype=np.int32), n))
+    columns["scenario_id"] = pa.DictionaryArray.from_arrays(codes, pa.array([sc.scenario_id for sc in scenarios]))
+    columns["scenario_name"] = pa.DictionaryArray.from_arrays(codes, pa.array([sc.name for sc in scenarios]))
 
-    df["under_over_staffed"] = df["planned_agents_scheduled"] - df["required_agents_scheduled"]
+    for name in results[0]:
+        if name not in columns:
+            columns[name] = pa.array(np.concatenate([r[name] for r in results]), from_pandas=True)
 
-    return df
+    return pa.table(columns)
 
 
 def main() -> None:
@@ -292,7 +372,7 @@ def main() -> None:
 
     # Identify per series metadata from staffing + contacts facts
     staff_meta = (
-        staffing.groupby(["channel", "queue"])
+        staffing.groupby(["channel", "queue"], observed=True)
         .agg(
             cost_per_hour=("cost_per_hour", "mean"),
             shrinkage_rate=("shrinkage_rate", "mean"),
@@ -300,7 +380,7 @@ def main() -> None:
         .reset_index()
     )
     contact_meta = (
-        contacts.groupby(["channel", "queue"])
+        contacts.groupby(["channel", "queue"], observed=True)
         .agg(
             aht_seconds=("aht_seconds", "mean"),
             sla_threshold_seconds=("sla_threshold_seconds", "max"),
@@ -310,75 +390,47 @@ def main() -> None:
     meta = staff_meta.merge(contact_meta, on=["channel", "queue"], how="left")
     meta["is_realtime"] = meta["channel"].isin(["voice", "chat"])
 
-    # Build forecasts for each channel/queue
-    forecasts = []
-    quality_rows = []
-
-    for (channel, queue), df_series in contacts.groupby(["channel", "queue"], sort=False):
-        df_series = df_series.sort_values("timestamp_start")
-
-        # Holdout split
-        cutoff = df_series["timestamp_start"].max() - pd.Timedelta(days=args.holdout_days)
-        train = df_series[df_series["timestamp_start"] <= cutoff]
-        test = df_series[df_series["timestamp_start"] > cutoff]
-
-        model = _fit_profile_and_trend(train, args.interval_minutes)
-
-        # Evaluate on holdout
-        if len(test) > 0:
-            pred_test = _forecast_series(model, pd.DatetimeIndex(test["timestamp_start"]), args.interval_minutes)
-            q = _evaluate_forecast(test["offered_contacts"], pred_test)
-            quality_rows.append(
-                {
-                    "channel": channel,
-                    "queue": queue,
-                    "mape": q["mape"],
-                    "rmse": q["rmse"],
-                    "holdout_days": args.holdout_days,
-                }
+    # Build forecasts for each channel/queue. Series are independent, so fit them in parallel.
+    series = [
+        (channel, queue, df_series[["timestamp_start", "offered_contacts"]])
+        for (channel, queue), df_series in contacts.groupby(["channel", "queue"], sort=False, observed=True)
+    ]
+    max_workers = max(1, min(len(series), os.cpu_count() or 1))
+    with ProcessPoolExecutor(max_workers=max_workers) as ex:
+        results = list(
+            ex.map(
+                _process_series,
+                *zip(*series),
+                repeat(args.interval_minutes),
+                repeat(args.horizon_days),
+                repeat(args.holdout_days),
             )
-
-        # Forecast future
-        last_ts = df_series["timestamp_start"].max()
-        freq = f"{args.interval_minutes}min"
-        future_index = pd.date_range(
-            start=last_ts + pd.Timedelta(minutes=args.interval_minutes),
-            periods=int(args.horizon_days * 24 * 60 / args.interval_minutes),
-            freq=freq,
-        )
-        pred_future = _forecast_series(model, future_index, args.interval_minutes)
-
-        f = pd.DataFrame(
-            {
-                "timestamp_start": future_index,
-                "channel": channel,
-                "queue": queue,
-                "forecast_offered": pred_future.values,
-                "interval_minutes": args.interval_minutes,
-            }
         )
-        forecasts.append(f)
+
+    forecasts = [f for f, _ in results]
+    quality_rows = [q for _, q in results if q is not None]
 
     forecast_df = pd.concat(forecasts, ignore_index=True)
+    for col in ("channel", "queue"):
+        forecast_df[col] = forecast_df[col].astype(meta[col].dtype)
 
     # Write forecast parquet
     os.makedirs(args.out_dir, exist_ok=True)
     forecast_path = os.path.join(args.out_dir, f"forecast_{args.interval_minutes}m.parquet")
-    forecast_df.to_parquet(forecast_path, index=False)
-
-    # Run scenarios
-    scenario_frames = []
-    for sc in DEFAULT_SCENARIOS:
-        scenario_frames.append(_simulate_scenario(forecast_df, meta, args.interval_minutes, sc))
+    write_parquet(forecast_df, forecast_path)
 
-    scenario_df = pd.concat(scenario_frames, ignore_index=True)
+    # Run scenarios: the staffing reference is joined once; scenarios only rescale it.
+    scenario_base = _attach_staffing_ref(forecast_df, meta)
+    scenario_results = [_simulate_scenario(scenario_base, args.interval_minutes, sc) for sc in DEFAULT_SCENARIOS]
+    scenario_table = _assemble_scenarios(scenario_base, DEFAULT_SCENARIOS, scenario_results)
     scenario_path = os.path.join(args.out_dir, f"scenario_results_{args.interval_minutes}m.parquet")
-    scenario_df.to_parquet(scenario_path, index=False)
+    write_table(scenario_table, scenario_path)
+    scenario_df = scenario_table.to_pandas()
 
     # KPI summary
     scenario_df["date"] = scenario_df["timestamp_start"].dt.date
     kpi = (
-        scenario_df.groupby(["scenario_id", "scenario_name", "date", "channel"], sort=False)
+        scenario_df.groupby(["scenario_id", "scenario_name", "date", "channel"], sort=False, observed=True)
         .agg(
             forecast_offered=("forecast_offered", "sum"),
             planned_labor_cost=("planned_labor_cost", "sum"),
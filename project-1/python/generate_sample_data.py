@@ -1,8 +1,8 @@
 """Generate synthetic call-center demand and staffing data.
 
-Outputs (CSV):
-- demand_raw.csv: interval-level demand by channel/queue
-- staffing_raw.csv: interval-level scheduled/available agents by channel/queue
+Outputs (Parquet by default, CSV with --format csv):
+- demand_raw.parquet: interval-level demand by channel/queue
+- staffing_raw.parquet: interval-level scheduled/available agents by channel/queue
 
 Base interval is 15 minutes.
 Aggregations to 30m/1h/8h/12h/24h are handled in the ETL step.
@@ -11,14 +11,20 @@ Aggregations to 30m/1h/8h/12h/24h are handled in the ETL step.
 from __future__ import annotations
 
 import argparse
+import csv
+import math
 import os
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from itertools import repeat
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
 
-from wfm_math import required_agents_realtime, required_agents_throughput, erlang_c_summary
+from wfm_io import write_table
+from wfm_math import erlang_c_batch, required_agents_batch, scheduled_agents_batch
 
 
 @dataclass(frozen=True)
@@ -29,44 +35,38 @@ class ChannelConfig:
     base_rate_per_15m: dict[str, float]  # per queue
     cost_per_hour: float
     aht_mean_seconds: dict[str, float]
+    aht_log_mean: dict[str, float] = field(init=False, repr=False)
 
+    def __post_init__(self) -> None:
+        # Lognormal location per queue, computed once per config rather than on every AHT draw.
+        object.__setattr__(self, "aht_log_mean", {q: math.log(m) for q, m in self.aht_mean_seconds.items()})
 
-def _hour_curve(hour: int) -> float:
-    # Business-hours peak with morning and afternoon bumps.
-    if 0 <= hour < 6:
-        return 0.15
-    if 6 <= hour < 9:
-        return 0.7
-    if 9 <= hour < 12:
-        return 1.15
-    if 12 <= hour < 14:
-        return 1.0
-    if 14 <= hour < 17:
-        return 1.2
-    if 17 <= hour < 20:
-        return 0.85
-    return 0.35
-
-
-def _dow_curve(dow: int) -> float:
-    # dow: Monday=0 ... Sunday=6
-    if dow in (5, 6):
-        return 0.55
-    if dow == 0:
-        return 1.1
-    if dow == 4:
-        return 0.95
-    return 1.0
-
-
-def _holiday_shock(date: datetime, rng: np.random.Generator) -> float:
+
+# Business-hours peak with morning and afternoon bumps, indexed by hour 0..23.
+_HOUR_CURVE = np.array([0.15] * 6 + [0.7] * 3 + [1.15] * 3 + [1.0] * 2 + [1.2] * 3 + [0.85] * 3 + [0.35] * 4)
+
+# Indexed by dow: Monday=0 ... Sunday=6
+_DOW_CURVE = np.array([1.1, 1.0, 1.0, 1.0, 0.95, 0.55, 0.55])
+
+
+# Channel-specific shaping, indexed by hour 0..23.
+_HOURS = np.arange(24)
+_CHANNEL_HOUR_CURVE = {
+    # Email tends to cluster during business hours.
+    "email": np.where((_HOURS >= 8) & (_HOURS <= 17), 1.1, 0.4),
+    "chat": np.where((_HOURS >= 10) & (_HOURS <= 18), 1.15, 0.55),
+    "voice": np.ones(24),
+}
+
+
+def _holiday_shock(days: int, rng: np.random.Generator) -> np.ndarray:
     # Occasionally create a one-day surge or dip.
     # (Keeps the dataset interesting for scenario testing.)
-    if rng.random() < 0.015:
-        return rng.uniform(1.25, 1.65)
-    if rng.random() < 0.01:
-        return rng.uniform(0.6, 0.85)
-    return 1.0
+    r1 = rng.random(days)
+    r2 = rng.random(days)
+    surge = rng.uniform(1.25, 1.65, size=days)
+    dip = rng.uniform(0.6, 0.85, size=days)
+    return np.where(r1 < 0.015, surge, np.where(r2 < 0.01, dip, 1.0))
 
 
 def build_configs() -> list[ChannelConfig]:
@@ -98,12 +98,122 @@ def build_configs() -> list[ChannelConfig]:
     ]
 
 
+def _generate_channel(
+    cfg: ChannelConfig,
+    rng: np.random.Generator,
+    hour: np.ndarray,
+    volume_curve: np.ndarray,
+    interval_seconds: int,
+) -> dict[str, np.ndarray]:
+    """Simulate every queue of one channel; each returned array is (queues, intervals)."""
+    n_queues = len(cfg.queues)
+    shape = (n_queues, len(hour))
+    realtime = cfg.name in ("voice", "chat")
+
+    # Standard-normal deviates, drawn once and scaled per use (mu + sigma * z).
+    aht_z = rng.standard_normal(shape)
+    shrinkage_z = rng.standard_normal(shape)
+    schedule_bias = 1.0 + 0.06 * rng.standard_normal(shape)
+
+    # Expected volume: one row per queue, one column per interval.
+    base_rate = np.array([cfg.base_rate_per_15m[q] for q in cfg.queues])
+    lam = np.maximum(0.1, base_rate[:, None] * volume_curve * _CHANNEL_HOUR_CURVE[cfg.name][hour])
+    offered = rng.poisson(lam)
+
+    # Abandonments for real-time channels.
+    if realtime:
+        base_abandon = 0.03 if cfg.name == "voice" else 0.04
+        p_abandon = np.clip(base_abandon + 0.01 * rng.standard_normal(shape), 0.0, 0.22)
+        abandoned = rng.binomial(offered, p_abandon)
+    else:
+        abandoned = np.zeros_like(offered)
+
+    handled = np.maximum(0, offered - abandoned)
+
+    # AHT varies a bit interval to interval.
+    log_mean = np.array([cfg.aht_log_mean[q] for q in cfg.queues])
+    aht = np.maximum(60.0, np.exp(log_mean[:, None] + 0.12 * aht_z))
+
+    # Staffing plan: compute "needed" then add small planning errors.
+    if realtime:
+        shrinkage = np.clip(0.28 + 0.03 * shrinkage_z, 0.15, 0.45)
+        sla_target = 0.8 if cfg.name == "voice" else 0.75
+        required = required_agents_batch(
+            handled.ravel(), interval_seconds, aht.ravel(), cfg.sla_threshold_seconds, sla_target
+        ).reshape(shape)
+    else:
+        shrinkage = np.clip(0.25 + 0.03 * shrinkage_z, 0.10, 0.40)
+        # Throughput staffing at 82% productivity.
+        required = np.ceil((handled * aht) / max(1, interval_seconds) / 0.82)
+    needed = scheduled_agents_batch(required, shrinkage)
+
+    # Planning error and schedule rounding.
+    scheduled = np.maximum(0, np.rint(needed * schedule_bias)).astype(np.int64)
+    available = np.maximum(0, np.floor(scheduled * (1.0 - shrinkage))).astype(np.int64)
+
+    # Service metrics based on available (actual).
+    if realtime:
+        asa, sl = erlang_c_batch(handled, interval_seconds, aht, available, cfg.sla_threshold_seconds)
+    else:
+        # Throughput: capacity-based.
+        capacity = (available * interval_seconds) / np.maximum(1e-6, aht)
+        sl = np.where(handled == 0, 1.0, np.minimum(1.0, capacity / np.maximum(1, handled)))
+        asa = np.zeros(shape)
+
+    return {
+        "offered_contacts": offered,
+        "handled_contacts": handled,
+        "abandoned_contacts": abandoned,
+        "aht_seconds": np.round(aht, 2),
+        "asa_seconds": np.where(np.isfinite(asa), np.round(asa, 2), np.nan),
+        "service_level": np.round(sl, 4),
+        "agents_scheduled": scheduled,
+        "shrinkage_rate": np.round(shrinkage, 4),
+        "agents_available": available,
+    }
+
+
+def _csv_values(col, start: int, stop: int) -> list:
+    if not np.ndim(col):
+        return [col] * (stop - start)
+    values = np.asarray(col[start:stop])
+    if values.dtype.kind == "f" and np.isnan(values).any():
+        # Missing values are written as empty fields.
+        out = values.astype(object)
+        out[np.isnan(values)] = None
+        return out.tolist()
+    return values.tolist()
+
+
+def _write_csv_chunks(columns: dict, n_rows: int, chunk_rows: int, path: str) -> None:
+    # 1 MiB write buffer; rows go out one chunk at a time straight from the column arrays.
+    with open(path, "w", newline="", buffering=1 << 20) as fp:
+        writer = csv.writer(fp, lineterminator="\n")
+        writer.writerow(columns)
+        for start in range(0, n_rows, chunk_rows):
+            stop = min(n_rows, start + chunk_rows)
+            writer.writerows(zip(*(_csv_values(col, start, stop) for col in columns.values())))
+
+
+def _write_raw_parquet(columns: dict, n_rows: int, path: str) -> None:
+    arrays = {}
+    for name, col in columns.items():
+        if not np.ndim(col):
+            col = np.full(n_rows, col)
+        arr = pa.array(col, from_pandas=True)
+        if name in ("channel", "queue"):
+            arr = arr.dictionary_encode()
+        arrays[name] = arr
+    write_table(pa.table(arrays), path)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--out_dir", required=True)
     parser.add_argument("--start", required=True, help="YYYY-MM-DD")
     parser.add_argument("--days", type=int, default=90)
     parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet", help="Output file format")
     args = parser.parse_args()
 
     os.makedirs(args.out_dir, exist_ok=True)
@@ -111,154 +221,110 @@ def main() -> None:
     start_dt = datetime.strptime(args.start, "%Y-%m-%d")
     end_dt = start_dt + timedelta(days=args.days)
 
-    rng = np.random.default_rng(args.seed)
+    seed_seq = np.random.SeedSequence(args.seed)
+    rng = np.random.default_rng(seed_seq)
     interval_minutes = 15
     interval_seconds = interval_minutes * 60
 
     configs = build_configs()
 
-    rows_demand: list[dict] = []
-    rows_staffing: list[dict] = []
-
     # Build a day-level shock map so it stays consistent across intervals.
-    day_shock: dict[str, float] = {}
-    d = start_dt
-    while d < end_dt:
-        day_shock[d.strftime("%Y-%m-%d")] = _holiday_shock(d, rng)
-        d += timedelta(days=1)
-
-    ts = start_dt
-    while ts < end_dt:
-        hour = ts.hour
-        dow = ts.weekday()
-        curve = _hour_curve(hour) * _dow_curve(dow) * day_shock[ts.strftime("%Y-%m-%d")]
-
-        # A gentle long-term trend (useful for forecast evaluation).
-        days_from_start = (ts - start_dt).days
-        trend = 1.0 + 0.0008 * days_from_start
-
-        # Shared noise component for correlated fluctuations.
-        shared_noise = rng.normal(1.0, 0.05)
-
-        for cfg in configs:
-            for q in cfg.queues:
-                base = cfg.base_rate_per_15m[q]
-
-                # Channel-specific shaping
-                if cfg.name == "email":
-                    # Email tends to cluster during business hours.
-                    ch_mult = 1.1 if 8 <= hour <= 17 else 0.4
-                elif cfg.name == "chat":
-                    ch_mult = 1.15 if 10 <= hour <= 18 else 0.55
-                else:  # voice
-                    ch_mult = 1.0
-
-                lam = max(0.1, base * curve * trend * shared_noise * ch_mult)
-                offered = int(rng.poisson(lam))
-
-                # AHT varies a bit interval to interval.
-                aht = max(60.0, rng.lognormal(mean=math.log(cfg.aht_mean_seconds[q]), sigma=0.12))
-
-                # Abandonments for real-time channels.
-                if cfg.name in ("voice", "chat"):
-                    base_abandon = 0.03 if cfg.name == "voice" else 0.04
-                    p_abandon = min(0.22, max(0.0, rng.normal(base_abandon, 0.01)))
-                    abandoned = int(rng.binomial(offered, p_abandon)) if offered > 0 else 0
-                else:
-                    abandoned = 0
-
-                handled = max(0, offered - abandoned)
-
-                # Staffing plan: compute "needed" then add small planning errors.
-                if cfg.name in ("voice", "chat"):
-                    shrinkage = float(np.clip(rng.normal(0.28, 0.03), 0.15, 0.45))
-                    staffing_req = required_agents_realtime(
-                        contacts=handled,
-                        aht_seconds=float(aht),
-                        interval_seconds=interval_seconds,
-                        sla_threshold_seconds=cfg.sla_threshold_seconds,
-                        sla_target=0.8 if cfg.name == "voice" else 0.75,
-                        shrinkage_rate=shrinkage,
-                    )
-                    needed = staffing_req.scheduled_agents
-                else:
-                    shrinkage = float(np.clip(rng.normal(0.25, 0.03), 0.10, 0.40))
-                    staffing_req = required_agents_throughput(
-                        contacts=handled,
-                        aht_seconds=float(aht),
-                        interval_seconds=interval_seconds,
-                        shrinkage_rate=shrinkage,
-                        productivity=0.82,
-                    )
-                    needed = staffing_req.scheduled_agents
-
-                # Planning error and schedule rounding.
-                schedule_bias = rng.normal(1.0, 0.06)
-                scheduled = int(max(0, round(needed * schedule_bias)))
-                available = int(max(0, math.floor(scheduled * (1.0 - shrinkage))))
-
-                # Service metrics based on available (actual).
-                if cfg.name in ("voice", "chat"):
-                    summary = erlang_c_summary(
-                        contacts=handled,
-                        aht_seconds=float(aht),
-                        interval_seconds=interval_seconds,
-                        agents=available,
-                        sla_threshold_seconds=cfg.sla_threshold_seconds,
-                    )
-                    asa = summary.asa_seconds
-                    sl = summary.service_level
-                else:
-                    # Throughput: capacity-based.
-                    capacity = (available * interval_seconds) / max(1e-6, float(aht))
-                    sl = 1.0 if handled == 0 else float(min(1.0, capacity / handled))
-                    asa = 0.0
-
-                rows_demand.append(
-                    {
-                        "timestamp_start": ts.isoformat(sep=" "),
-                        "interval_minutes": interval_minutes,
-                        "channel": cfg.name,
-                        "queue": q,
-                        "offered_contacts": offered,
-                        "handled_contacts": handled,
-                        "abandoned_contacts": abandoned,
-                        "aht_seconds": round(float(aht), 2),
-                        "asa_seconds": round(float(asa), 2) if math.isfinite(asa) else None,
-                        "sla_threshold_seconds": cfg.sla_threshold_seconds,
-                        "service_level": round(float(sl), 4),
-                    }
-                )
-
-                rows_staffing.append(
-                    {
-                        "timestamp_start": ts.isoformat(sep=" "),
-                        "interval_minutes": interval_minutes,
-                        "channel": cfg.name,
-                        "queue": q,
-                        "agents_scheduled": scheduled,
-                        "shrinkage_rate": round(float(shrinkage), 4),
-                        "agents_available": available,
-                        "cost_per_hour": cfg.cost_per_hour,
-                    }
-                )
-
-        ts += timedelta(minutes=interval_minutes)
-
-    demand_df = pd.DataFrame(rows_demand)
-    staffing_df = pd.DataFrame(rows_staffing)
-
-    demand_path = os.path.join(args.out_dir, "demand_raw.csv")
-    staffing_path = os.path.join(args.out_dir, "staffing_raw.csv")
-
-    demand_df.to_csv(demand_path, index=False)
-    staffing_df.to_csv(staffing_path, index=False)
-
-    print(f"Wrote {len(demand_df):,} rows -> {demand_path}")
-    print(f"Wrote {len(staffing_df):,} rows -> {staffing_path}")
+    day_shock = _holiday_shock(args.days, rng)
+
+    # One vector lane per interval; each channel draws all of its queues in one call per distribution.
+    ts_arr = pd.date_range(start_dt, end_dt, freq=f"{interval_minutes}min", inclusive="left")
+    n = len(ts_arr)
+    hour = ts_arr.hour.to_numpy()
+    dow = ts_arr.dayofweek.to_numpy()
+    # The index is whole days of fixed-size intervals, so day-level values expand by repeat.
+    intervals_per_day = 24 * 60 // interval_minutes
+    days_from_start = np.repeat(np.arange(args.days), intervals_per_day)
+
+    curve = _HOUR_CURVE[hour] * _DOW_CURVE[dow] * np.repeat(day_shock, intervals_per_day)
+
+    # A gentle long-term trend (useful for forecast evaluation).
+    trend = 1.0 + 0.0008 * days_from_start
+
+    # Shared noise component for correlated fluctuations across channels.
+    shared_noise = 1.0 + 0.05 * rng.standard_normal(n)
+    volume_curve = curve * trend * shared_noise
+
+    # Channels are independent given the shared curve; each worker draws from its own child stream.
+    max_workers = max(1, min(len(configs), os.cpu_count() or 1))
+    with ProcessPoolExecutor(max_workers=max_workers) as ex:
+        blocks = list(
+            ex.map(
+                _generate_channel,
+                configs,
+                [np.random.default_rng(child) for child in seed_seq.spawn(len(configs))],
+                repeat(hour),
+                repeat(volume_curve),
+                repeat(interval_seconds),
+            )
+        )
+
+    # Stack the (queue, interval) blocks and flatten timestamp-major: series s at interval i lands on row i * n_series + s.
+    series = [(cfg, q) for cfg in configs for q in cfg.queues]
+    n_series = len(series)
+    n_rows = n * n_series
+    cols = {name: np.concatenate([block[name] for block in blocks]).T.ravel() for name in blocks[0]}
+
+    # Key columns repeat with the row layout: each timestamp once per series, the series names once per timestamp.
+    ts_col = ts_arr.repeat(n_series)
+    channel_col = np.tile(np.array([cfg.name for cfg, _ in series], dtype=object), n)
+    queue_col = np.tile(np.array([q for _, q in series], dtype=object), n)
+    sla_thr_col = np.tile(np.array([cfg.sla_threshold_seconds for cfg, _ in series]), n)
+    cost_col = np.tile(np.array([cfg.cost_per_hour for cfg, _ in series]), n)
+
+    demand_cols = {
+        "timestamp_start": ts_col,
+        "interval_minutes": interval_minutes,
+        "channel": channel_col,
+        "queue": queue_col,
+        "offered_contacts": cols["offered_contacts"],
+        "handled_contacts": cols["handled_contacts"],
+        "abandoned_contacts": cols["abandoned_contacts"],
+        "aht_seconds": cols["aht_seconds"],
+        "asa_seconds": cols["asa_seconds"],
+        "sla_threshold_seconds": sla_thr_col,
+        "service_level": cols["service_level"],
+    }
+
+    staffing_cols = {
+        "timestamp_start": ts_col,
+        "interval_minutes": interval_minutes,
+        "channel": channel_col,
+        "queue": queue_col,
+        "agents_scheduled": cols["agents_scheduled"],
+        "shrinkage_rate": cols["shrinkage_rate"],
+        "agents_available": cols["agents_available"],
+        "cost_per_hour": cost_col,
+    }
+
+    demand_path = os.path.join(args.out_dir, f"demand_raw.{args.format}")
+    staffing_path = os.path.join(args.out_dir, f"staffing_raw.{args.format}")
+
+    # Drop a previous run's other-format extracts so the ETL never picks up stale data.
+    other_format = "csv" if args.format == "parquet" else "parquet"
+    for name in ("demand_raw", "staffing_raw"):
+        stale = os.path.join(args.out_dir, f"{name}.{other_format}")
+        if os.path.exists(stale):
+            os.remove(stale)
+
+    if args.format == "parquet":
+        _write_raw_parquet(demand_cols, n_rows, demand_path)
+        _write_raw_parquet(staffing_cols, n_rows, staffing_path)
+    else:
+        # Format each timestamp once rather than once per series row.
+        ts_str = np.asarray(ts_arr.strftime("%Y-%m-%d %H:%M:%S"), dtype=object).repeat(n_series)
+        # Stream a week of rows at a time so only one chunk is ever formatted as text.
+        chunk_rows = 7 * intervals_per_day * n_series
+        _write_csv_chunks({**demand_cols, "timestamp_start": ts_str}, n_rows, chunk_rows, demand_path)
+        _write_csv_chunks({**staffing_cols, "timestamp_start": ts_str}, n_rows, chunk_rows, staffing_path)
+
+    print(f"Wrote {n_rows:,} rows -> {demand_path}")
+    print(f"Wrote {n_rows:,} rows -> {staffing_path}")
 
 
 if __name__ == "__main__":
-    import math
-
     main()
@@ -0,0 +1,42 @@
+"""Shared dataframe helpers for the generator, ETL and forecast scripts."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pandas.api.types import union_categoricals
+
+
+def align_categories(left: pd.DataFrame, right: pd.DataFrame, cols: list[str]) -> None:
+    """Cast cols to categoricals with identical (sorted) categories on both frames, in place."""
+    for col in cols:
+        cats = union_categoricals(
+            [left[col].astype("category"), right[col].astype("category")],
+            sort_categories=True,
+        ).categories
+        dtype = pd.CategoricalDtype(cats)
+        left[col] = left[col].astype(dtype)
+        right[col] = right[col].astype(dtype)
+
+
+def epoch_ns(ts: pd.Series | pd.DatetimeIndex) -> np.ndarray:
+    """UTC timestamps as int64 nanoseconds since the epoch."""
+    return ts.to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+def write_table(table: pa.Table, path: str) -> None:
+    """Write table as ZSTD Parquet with the settings shared by every file the pipeline writes."""
+    pq.write_table(
+        table,
+        path,
+        compression="zstd",
+        compression_level=3,
+        row_group_size=256_000,
+        use_dictionary=True,
+    )
+
+
+def write_parquet(df: pd.DataFrame, path: str) -> None:
+    write_table(pa.Table.from_pandas(df, preserve_index=False, safe=False), path)
@@ -11,6 +11,16 @@ from __future__ import annotations
 import math
 from dataclasses import dataclass
 
+import numpy as np
+
+
+# Erlang C works on a^k / k! terms that pass float64's range once traffic exceeds ~700
+# Erlangs. Pw only depends on the ratio of the carried term to the carried sum, so both
+# are scaled down together by an exact power of two whenever the term gets this large.
+_RESCALE_ABOVE = 2.0**500
+_RESCALE = 2.0**-500
+_RESCALE_LOG_ABOVE = 500 * math.log(2.0)
+
 
 @dataclass(frozen=True)
 class ErlangResult:
@@ -27,11 +37,6 @@ class StaffingResult:
     scheduled_agents: int
 
 
-def _factorial(n: int) -> float:
-    # math.factorial returns int; we want float to avoid overflow patterns.
-    return float(math.factorial(n))
-
-
 def erlang_c_prob_wait(traffic_erlangs: float, agents: int) -> float:
     """Probability a contact waits (Erlang C).
 
@@ -45,13 +50,25 @@ def erlang_c_prob_wait(traffic_erlangs: float, agents: int) -> float:
     a = traffic_erlangs
     n = agents
 
-    # Sum_{k=0}^{n-1} (a^k / k!)
-    s = 0.0
-    for k in range(0, n):
-        s += (a**k) / _factorial(k)
+    # Sum_{k=0}^{n-1} (a^k / k!), built with term_k = term_{k-1} * a / k so
+    # neither a^k nor k! is materialized; term and s share one running scale.
+    term = 1.0
+    s = 1.0
+    for k in range(1, n):
+        term *= a / k
+        if term > _RESCALE_ABOVE:
+            term *= _RESCALE
+            s *= _RESCALE
+        s += term
+
+    return _pw_from_partial_sum(a, n, term, s)
+
 
+def _pw_from_partial_sum(a: float, n: int, term: float, s: float) -> float:
+    # Erlang C Pw for 0 < a < n, given term == a^(n-1) / (n-1)! and s == Sum_{k=0}^{n-1} (a^k / k!)
+    # (both may carry the same scale factor).
     # Numerator: (a^n / n!) * (n / (n - a))
-    numer = (a**n) / _factorial(n) * (n / (n - a))
+    numer = term * a / n * (n / (n - a))
     denom = s + numer
 
     if denom <= 0:
@@ -61,6 +78,25 @@ def erlang_c_prob_wait(traffic_erlangs: float, agents: int) -> float:
 
 def erlang_c_asa_seconds(traffic_erlangs: float, agents: int, aht_seconds: float) -> float:
     """Average Speed of Answer (ASA) in seconds."""
+    return _asa_from_pw(erlang_c_prob_wait(traffic_erlangs, agents), traffic_erlangs, agents, aht_seconds)
+
+
+def erlang_c_service_level(
+    traffic_erlangs: float,
+    agents: int,
+    aht_seconds: float,
+    threshold_seconds: float,
+) -> float:
+    """Service level: P(wait <= threshold).
+
+    SLA = 1 - Pw * exp(-(agents-traffic) * (threshold / AHT))
+    """
+    pw = erlang_c_prob_wait(traffic_erlangs, agents)
+    return _sl_from_pw(pw, traffic_erlangs, agents, aht_seconds, threshold_seconds)
+
+
+def _asa_from_pw(pw: float, traffic_erlangs: float, agents: int, aht_seconds: float) -> float:
+    # ASA given an already computed Pw, so callers needing ASA and SLA share one Erlang C sum.
     if aht_seconds <= 0:
         return float("inf")
     if agents <= 0:
@@ -70,21 +106,18 @@ def erlang_c_asa_seconds(traffic_erlangs: float, agents: int, aht_seconds: float
     if traffic_erlangs >= agents:
         return float("inf")
 
-    pw = erlang_c_prob_wait(traffic_erlangs, agents)
     # ASA = (Pw * AHT) / (agents - traffic)
     return (pw * aht_seconds) / max(1e-9, (agents - traffic_erlangs))
 
 
-def erlang_c_service_level(
+def _sl_from_pw(
+    pw: float,
     traffic_erlangs: float,
     agents: int,
     aht_seconds: float,
     threshold_seconds: float,
 ) -> float:
-    """Service level: P(wait <= threshold).
-
-    SLA = 1 - Pw * exp(-(agents-traffic) * (threshold / AHT))
-    """
+    # Service level given an already computed Pw.
     if threshold_seconds <= 0:
         return 0.0
     if aht_seconds <= 0:
@@ -96,7 +129,6 @@ def erlang_c_service_level(
     if traffic_erlangs >= agents:
         return 0.0
 
-    pw = erlang_c_prob_wait(traffic_erlangs, agents)
     exponent = -(agents - traffic_erlangs) * (threshold_seconds / aht_seconds)
     return max(0.0, min(1.0, 1.0 - pw * math.exp(exponent)))
 
@@ -108,10 +140,13 @@ def erlang_metrics(
     agents: int,
     sla_threshold_seconds: float,
 ) -> ErlangResult:
+    if contacts <= 0:
+        # Nothing arrives, so nobody waits; skip the Erlang C sum entirely.
+        return ErlangResult(0.0, agents, 0.0, 0.0, 1.0)
     traffic = (contacts * aht_seconds) / max(1, interval_seconds)
     pw = erlang_c_prob_wait(traffic, agents)
-    asa = erlang_c_asa_seconds(traffic, agents, aht_seconds)
-    sl = erlang_c_service_level(traffic, agents, aht_seconds, sla_threshold_seconds)
+    asa = _asa_from_pw(pw, traffic, agents, aht_seconds)
+    sl = _sl_from_pw(pw, traffic, agents, aht_seconds, sla_threshold_seconds)
     return ErlangResult(traffic, agents, pw, asa, sl)
 
 
@@ -125,15 +160,37 @@ def required_agents_for_sla(
 ) -> int:
     """Smallest agent count that meets SLA target.
 
-    Returns max_agents if target can't be met within the search range.
+    Returns 0 when there are no contacts to serve, and max_agents if the target
+    can't be met within the search range.
     """
+    if contacts <= 0:
+        return 0
+
     traffic = (contacts * aht_seconds) / max(1, interval_seconds)
+    a = traffic
 
     # Start at ceil(traffic) to avoid unstable solutions.
     start = max(1, int(math.ceil(traffic)))
-    for n in range(start, max_agents + 1):
-        sl = erlang_c_service_level(traffic, n, aht_seconds, sla_threshold_seconds)
-        if sl >= sla_target:
+    if start > max_agents:
+        return max_agents
+
+    # Walk agent counts upward once, carrying the Erlang C prefix sum from one n to the
+    # next: term == a^(n-1) / (n-1)!, s == Sum_{k=0}^{n-1} (a^k / k!)
+    term = 1.0
+    s = 1.0
+    for n in range(1, max_agents + 1):
+        if n > 1:
+            term *= a / (n - 1)
+            if term > _RESCALE_ABOVE:
+                term *= _RESCALE
+                s *= _RESCALE
+            s += term
+        if n < start:
+            continue
+
+        # Same Pw as erlang_c_prob_wait(a, n).
+        pw = 1.0 if a <= 0 or a >= n else _pw_from_partial_sum(a, n, term, s)
+        if _sl_from_pw(pw, a, n, aht_seconds, sla_threshold_seconds) >= sla_target:
             return n
     return max_agents
 
@@ -191,3 +248,138 @@ def required_agents_throughput(
     r = max(0.0, min(0.95, shrinkage_rate))
     required_scheduled = int(math.ceil(required_available / max(1e-9, (1.0 - r))))
     return StaffingResult(available_agents=required_available, scheduled_agents=required_scheduled)
+
+
+# Vectorized helpers (one call per batch of intervals instead of per row)
+
+def erlang_c_prob_wait_batch(traffic_erlangs: np.ndarray, agents: np.ndarray) -> np.ndarray:
+    """Vectorized erlang_c_prob_wait over arrays of traffic and agent counts.
+
+    Uses the recurrence term_k = term_{k-1} * a / k, so neither a**k nor k! is
+    materialized; the loop runs over k while every unfinished row is updated at once.
+    """
+    a_all = np.asarray(traffic_erlangs, dtype=np.float64)
+    n_all = np.asarray(agents, dtype=np.int64)
+    a_all, n_all = np.broadcast_arrays(a_all, n_all)
+    pw = np.ones(a_all.shape, dtype=np.float64)
+
+    ok = (n_all > 0) & (a_all > 0) & (a_all < n_all)
+    if not ok.any():
+        return pw
+
+    # Rows sorted by n, so the rows still accumulating at step k (n > k) are a suffix.
+    order = np.argsort(n_all[ok], kind="stable")
+    a = a_all[ok][order]
+    n = n_all[ok][order]
+
+    # Sum_{k=0}^{n-1} (a^k / k!), same steps and scaling as the scalar loop; a row's term
+    # stops at a^(n-1) / (n-1)! once k reaches its n.
+    n_max = int(n[-1])
+    starts = np.searchsorted(n, np.arange(n_max), side="right")
+    # term <= e^a, so rows this light never reach the rescale threshold.
+    rescale = a.max() > _RESCALE_LOG_ABOVE
+    term = np.ones_like(a)
+    s = np.ones_like(a)
+    for k in range(1, n_max):
+        i = starts[k]
+        t = term[i:]
+        t *= a[i:] / k
+        if rescale:
+            big = t > _RESCALE_ABOVE
+            if big.any():
+                t[big] *= _RESCALE
+                s[i:][big] *= _RESCALE
+        s[i:] += t
+
+    # Numerator: (a^n / n!) * (n / (n - a))
+    numer = term * a / n * (n / (n - a))
+    denom = s + numer
+
+    res = np.ones_like(a)
+    pos = denom > 0
+    res[pos] = np.clip(numer[pos] / denom[pos], 0.0, 1.0)
+    unsorted = np.empty_like(res)
+    unsorted[order] = res
+    pw[ok] = unsorted
+    return pw
+
+
+def erlang_c_batch(
+    contacts: np.ndarray,
+    interval_seconds: int,
+    aht_seconds: np.ndarray,
+    agents: np.ndarray,
+    sla_threshold_seconds: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized erlang_c_summary: return (asa_seconds, service_level) arrays.
+
+    Edge cases follow erlang_c_summary row by row (no contacts -> ASA 0, SLA 1).
+    """
+    contacts = np.asarray(contacts, dtype=np.float64)
+    aht = np.asarray(aht_seconds, dtype=np.float64)
+    n = np.asarray(agents, dtype=np.int64)
+    thr = np.asarray(sla_threshold_seconds, dtype=np.float64)
+    contacts, aht, n, thr = np.broadcast_arrays(contacts, aht, n, thr)
+
+    traffic = (contacts * aht) / max(1, interval_seconds)
+    pw = erlang_c_prob_wait_batch(traffic, n)
+    stable = (aht > 0) & (n > 0) & (traffic > 0) & (traffic < n)
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        # ASA = (Pw * AHT) / (agents - traffic)
+        asa = (pw * aht) / np.maximum(1e-9, n - traffic)
+        sl = 1.0 - pw * np.exp(-(n - traffic) * (thr / aht))
+
+    asa = np.where(stable, asa, np.inf)
+    asa = np.where((aht > 0) & (n > 0) & (traffic <= 0), 0.0, asa)
+
+    sl = np.where(stable, np.clip(sl, 0.0, 1.0), 0.0)
+    sl = np.where((aht > 0) & (n > 0) & (traffic <= 0), 1.0, sl)
+    sl = np.where(thr <= 0, 0.0, sl)
+
+    idle = contacts <= 0
+    asa = np.where(idle, 0.0, asa)
+    sl = np.where(idle, 1.0, sl)
+    return asa, sl
+
+
+def required_agents_batch(
+    contacts: np.ndarray,
+    interval_seconds: int,
+    aht_seconds: np.ndarray,
+    sla_threshold_seconds: np.ndarray,
+    sla_target: float | np.ndarray,
+    max_agents: int = 500,
+) -> np.ndarray:
+    """Vectorized required_agents_for_sla: smallest available agent count per row.
+
+    Rows with no contacts get 0; rows that can't meet the target within the
+    search range get max_agents.
+    """
+    contacts = np.asarray(contacts, dtype=np.float64)
+    aht = np.asarray(aht_seconds, dtype=np.float64)
+    thr = np.asarray(sla_threshold_seconds, dtype=np.float64)
+    target = np.asarray(sla_target, dtype=np.float64)
+    contacts, aht, thr, target = np.broadcast_arrays(contacts, aht, thr, target)
+
+    traffic = (contacts * aht) / max(1, interval_seconds)
+
+    # Start at ceil(traffic) to avoid unstable solutions; step unresolved rows up together.
+    n = np.maximum(1, np.ceil(traffic)).astype(np.int64)
+    result = np.full(traffic.shape, max_agents, dtype=np.int64)
+    result[contacts <= 0] = 0
+    todo = np.flatnonzero((n <= max_agents) & (contacts > 0))
+    while todo.size:
+        _, sl = erlang_c_batch(contacts[todo], interval_seconds, aht[todo], n[todo], thr[todo])
+        met = sl >= target[todo]
+        result[todo[met]] = n[todo[met]]
+        todo = todo[~met]
+        n[todo] += 1
+        todo = todo[n[todo] <= max_agents]
+    return result
+
+
+def scheduled_agents_batch(available_agents: np.ndarray, shrinkage_rate: np.ndarray) -> np.ndarray:
+    """Vectorized available -> scheduled conversion used by the required_agents_* helpers."""
+    r = np.clip(np.asarray(shrinkage_rate, dtype=np.float64), 0.0, 0.95)
+    return np.ceil(np.asarray(available_agents) / np.maximum(1e-9, 1.0 - r)).astype(np.int64)